@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 import logging
 
@@ -11,6 +12,9 @@ NETEASE_COOKIE = os.getenv('NETEASE_COOKIE')
 NOTION_TOKEN = os.getenv('NOTION_TOKEN')
 NOTION_DATABASE_ID = os.getenv('NOTION_DATABASE_ID')
 NETEASE_USER_ID = os.getenv('NETEASE_USER_ID')
+# 多账户配置（JSON 列表），例如:
+# [{"name": "爸爸", "netease_cookie": "...", "netease_user_id": "123", "notion_database_id": "..."}]
+SYNC_ACCOUNTS = os.getenv('SYNC_ACCOUNTS')
 
 # 打印环境变量（不包括完整的 cookie）
 logging.info(f"NETEASE_USER_ID: {NETEASE_USER_ID}")
@@ -18,11 +22,65 @@ logging.info(f"NOTION_TOKEN: {NOTION_TOKEN[:10]}..." if NOTION_TOKEN else "NOTIO
 logging.info(f"NOTION_DATABASE_ID: {NOTION_DATABASE_ID}" if NOTION_DATABASE_ID else "NOTION_DATABASE_ID 未设置")
 logging.info(f"NETEASE_COOKIE length: {len(NETEASE_COOKIE)}" if NETEASE_COOKIE else "NETEASE_COOKIE 未设置")
 
+def load_accounts():
+    """
+    解析账户 -> 数据库映射列表
+
+    返回:
+    list: 每个元素包含 name, cookie, user_id, database_id
+    未设置 SYNC_ACCOUNTS 时回退为单账户配置
+    """
+    if not SYNC_ACCOUNTS:
+        return [{
+            'name': 'default',
+            'cookie': NETEASE_COOKIE,
+            'user_id': NETEASE_USER_ID,
+            'database_id': NOTION_DATABASE_ID,
+        }]
+
+    try:
+        raw_accounts = json.loads(SYNC_ACCOUNTS)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"SYNC_ACCOUNTS 不是合法的 JSON：{str(e)}")
+
+    if not isinstance(raw_accounts, list) or not raw_accounts:
+        raise ValueError("SYNC_ACCOUNTS 应为非空的 JSON 列表。")
+
+    required_fields = ['netease_cookie', 'netease_user_id', 'notion_database_id']
+    accounts = []
+    for index, raw in enumerate(raw_accounts, 1):
+        if not isinstance(raw, dict):
+            raise ValueError(f"SYNC_ACCOUNTS 第 {index} 项应为 JSON 对象。")
+
+        name = raw.get('name') or f"account{index}"
+        missing_fields = [field for field in required_fields if not raw.get(field)]
+        if missing_fields:
+            raise ValueError(f"账户 {name} 缺少必填字段: {', '.join(missing_fields)}")
+
+        # 进度文件以账户名为键，重名会互相覆盖断点
+        if any(account['name'] == name for account in accounts):
+            raise ValueError(f"SYNC_ACCOUNTS 中存在重复的账户名: {name}")
+
+        accounts.append({
+            'name': name,
+            'cookie': raw['netease_cookie'],
+            'user_id': str(raw['netease_user_id']),
+            'database_id': raw['notion_database_id'],
+        })
+    return accounts
+
+ACCOUNTS = load_accounts()
+
 # 添加额外的检查
-if not NOTION_TOKEN or not NOTION_DATABASE_ID:
-    raise ValueError("NOTION_TOKEN 或 NOTION_DATABASE_ID 未正确设置。请检查您的 .env 文件。")
+if not NOTION_TOKEN:
+    raise ValueError("NOTION_TOKEN 未正确设置。请检查您的 .env 文件。")
 
-if len(NOTION_DATABASE_ID) != 36:
-    raise ValueError(f"NOTION_DATABASE_ID 长度不正确。应为 36 个字符，当前长度为 {len(NOTION_DATABASE_ID)}。")
+for account in ACCOUNTS:
+    database_id = account['database_id']
+    if not database_id:
+        raise ValueError(f"账户 {account['name']} 的 NOTION_DATABASE_ID 未正确设置。请检查您的 .env 文件。")
+    if len(database_id) != 36:
+        raise ValueError(f"账户 {account['name']} 的 NOTION_DATABASE_ID 长度不正确。应为 36 个字符，当前长度为 {len(database_id)}。")
 
+logging.info(f"共加载 {len(ACCOUNTS)} 个账户: {', '.join(account['name'] for account in ACCOUNTS)}")
 logging.info("配置加载完成，所有必要的环境变量都已设置。")
\ No newline at end of file
@@ -1,17 +1,29 @@
+import sys
 import time
 import json
+import traceback
+from collections import deque
+from config import ACCOUNTS
 from netease_api import get_playlist_info, get_playlist_tracks, get_playlist_ids, check_track_availability
-from notion_api import sync_track_to_notion, verify_notion_database_structure, get_notion_tracks, mark_track_as_removed_from_playlist, mark_track_as_unavailable, create_notion_playlist
+from notion_api import sync_track_to_notion, verify_notion_database_structure, get_notion_tracks, mark_track_as_removed_from_playlist, mark_track_as_unavailable, create_notion_playlist, update_track_position
+from playlist_order import compute_position_updates
 
 PROGRESS_FILE = 'sync_progress.json'
 
 def load_progress():
     try:
         with open(PROGRESS_FILE, 'r') as f:
-            return json.load(f)
+            progress = json.load(f)
     except FileNotFoundError:
         return {}
 
+    # 旧版进度文件为 {歌单ID: 序号}，迁移到单账户模式的 default 账户下
+    legacy_progress = {key: value for key, value in progress.items() if not isinstance(value, dict)}
+    progress = {key: value for key, value in progress.items() if isinstance(value, dict)}
+    if legacy_progress:
+        progress.setdefault('default', legacy_progress)
+    return progress
+
 def save_progress(progress):
     with open(PROGRESS_FILE, 'w') as f:
         json.dump(progress, f)
@@ -47,6 +59,18 @@ def compare_tracks(netease_tracks, notion_tracks, playlist_id, playlist_name):
 
     return to_add, to_update, to_remove
 
+def compare_track_order(netease_tracks, notion_tracks, playlist_id, playlist_name):
+    notion_track_dict = {
+        str(track['歌曲ID']): track
+        for track in notion_tracks
+        if str(track['歌单ID']) == str(playlist_id) and track['歌单'] == playlist_name
+    }
+    stored_positions = {track_id: track.get('排序', '') for track_id, track in notion_track_dict.items()}
+    page_ids = {track_id: track['页面ID'] for track_id, track in notion_track_dict.items()}
+    positions = compute_position_updates([track['id'] for track in netease_tracks], stored_positions)
+    print(f"需要更新排序的歌曲数: {len(positions)}")
+    return positions, page_ids
+
 def needs_update(netease_track, notion_track):
     netease_status = get_status_from_fee(netease_track.get('fee', 0))
     notion_status = notion_track['状态']
@@ -65,76 +89,140 @@ def get_status_from_fee(fee):
     else:
         return '未知'
 
-def sync_playlist(playlist_id, playlist_index, total_playlists):
-    playlist_info = get_playlist_info(playlist_id)
+def sync_playlist(playlist_id, playlist_index, total_playlists, account=None):
+    cookie = account['cookie'] if account else None
+    database_id = account['database_id'] if account else None
+
+    playlist_info = get_playlist_info(playlist_id, cookie)
     playlist_name = playlist_info['name']
     print(f"\n同步歌单 {playlist_index}/{total_playlists}: {playlist_name} (ID: {playlist_id})")
     print(f"曲目数: {playlist_info['trackCount']}")
 
-    netease_tracks = get_playlist_tracks(playlist_id)
-    notion_tracks = get_notion_tracks()
+    netease_tracks = get_playlist_tracks(playlist_id, cookie)
+    notion_tracks = get_notion_tracks(database_id)
 
     # 检查 Notion 中是否存在该歌单
     notion_playlist = next((p for p in notion_tracks if str(p['歌单ID']) == str(playlist_id)), None)
     
     if not notion_playlist:
         print(f"Notion 中不存在歌单 {playlist_name}，正在创建...")
-        create_notion_playlist(playlist_info)
+        create_notion_playlist(playlist_info, database_id)
         to_add = netease_tracks
         to_update = []
         to_remove = []
     else:
         to_add, to_update, to_remove = compare_tracks(netease_tracks, notion_tracks, playlist_id, playlist_name)
 
-    print(f"新增: {len(to_add)}, 更新: {len(to_update)}, 处理: {len(to_remove)}")
+    positions, page_ids = compare_track_order(netease_tracks, notion_tracks, playlist_id, playlist_name)
+
+    print(f"新增: {len(to_add)}, 更新: {len(to_update)}, 处理: {len(to_remove)}, 排序: {len(positions)}")
 
-    if not to_add and not to_update and not to_remove:
+    if not to_add and not to_update and not to_remove and not positions:
         print(f"'{playlist_name}' 无需同步")
         return
 
     for index, track in enumerate(to_add, 1):
         status = get_status_from_fee(track.get('fee', 0))
-        result = sync_track_to_notion(track, playlist_id, playlist_name, status, index, len(to_add), "新增")
+        position = positions.pop(str(track['id']), None)
+        result = sync_track_to_notion(track, playlist_id, playlist_name, status, index, len(to_add), "新增", database_id, position)
         print(result)
 
     for index, track in enumerate(to_update, 1):
         status = get_status_from_fee(track.get('fee', 0))
-        result = sync_track_to_notion(track, playlist_id, playlist_name, status, index, len(to_update), "更新")
+        position = positions.pop(str(track['id']), None)
+        result = sync_track_to_notion(track, playlist_id, playlist_name, status, index, len(to_update), "更新", database_id, position)
         print(result)
 
     for index, notion_track in enumerate(to_remove, 1):
         track_id = notion_track['歌曲ID']
-        availability = check_track_availability(track_id)
+        availability = check_track_availability(track_id, cookie)
         print(f"歌曲 ID {track_id} 在网易云曲库中的可用性: {availability}")
         if availability:
-            result = mark_track_as_removed_from_playlist(track_id, playlist_id, playlist_name)
+            result = mark_track_as_removed_from_playlist(track_id, playlist_id, playlist_name, database_id)
             print(result)
         else:
-            result = mark_track_as_unavailable(track_id, playlist_id)
+            result = mark_track_as_unavailable(track_id, playlist_id, database_id)
             print(result)
 
+    # 新增和更新时已写入排序键，剩下的只是顺序发生变化的歌曲
+    for index, (track_id, position) in enumerate(positions.items(), 1):
+        result = update_track_position(page_ids[track_id], track_id, position)
+        print(f"[{index}/{len(positions)}] {result}")
+
     print(f"'{playlist_name}' 同步完成")
 
-# 在 main 函数中，简化输出
-def main():
-    if not verify_notion_database_structure():
-        print("Notion数据库结构验证失败，请检查并修复问题后重试。")
-        return
+def account_sync_steps(account, progress):
+    """
+    按歌单逐个同步单个账户，每同步完一个歌单让出一次控制权
 
-    playlist_ids = get_playlist_ids()
-    print(f"用户歌单数量: {len(playlist_ids)}")
+    参数:
+    account: config.ACCOUNTS 中的账户配置
+    progress: 全部账户共享的进度字典，按账户名分区
+    """
+    name = account['name']
+    playlist_ids = get_playlist_ids(account['user_id'], account['cookie'])
+    print(f"[{name}] 用户歌单数量: {len(playlist_ids)}")
 
-    progress = load_progress()
-    start_index = max(progress.values()) if progress else 0
+    account_progress = progress.get(name)
+    if not isinstance(account_progress, dict):
+        account_progress = {}
+    progress[name] = account_progress
+    start_index = max(account_progress.values()) if account_progress else 0
 
     for index, playlist_id in enumerate(playlist_ids[start_index:], start_index + 1):
-        print(f"开始同步歌单 {index}/{len(playlist_ids)}: ID {playlist_id}")
-        sync_playlist(playlist_id, index, len(playlist_ids))
-        progress[playlist_id] = index
+        print(f"[{name}] 开始同步歌单 {index}/{len(playlist_ids)}: ID {playlist_id}")
+        sync_playlist(playlist_id, index, len(playlist_ids), account)
+        account_progress[playlist_id] = index
         save_progress(progress)
-        print(f"歌单 {index}/{len(playlist_ids)}: ID {playlist_id} 同步完成")
+        print(f"[{name}] 歌单 {index}/{len(playlist_ids)}: ID {playlist_id} 同步完成")
+        yield
+
+    print(f"\n[{name}] 所有播放列表同步完成")
 
-    print("\n所有播放列表同步完成")
+# 在 main 函数中，简化输出
+def main():
+    # 多个账户可能共用同一个数据库，每个数据库只验证一次
+    invalid_databases = set()
+    for database_id in dict.fromkeys(account['database_id'] for account in ACCOUNTS):
+        if not verify_notion_database_structure(database_id):
+            print(f"Notion数据库 {database_id} 结构验证失败，请检查并修复问题后重试。")
+            invalid_databases.add(database_id)
+
+    progress = load_progress()
+
+    # 数据库验证失败的账户直接跳过，其余账户照常同步
+    failed_accounts = []
+    active_accounts = []
+    for account in ACCOUNTS:
+        if account['database_id'] in invalid_databases:
+            print(f"[{account['name']}] 数据库结构验证失败，跳过该账户")
+            failed_accounts.append(account['name'])
+        else:
+            active_accounts.append(account)
+
+    # 轮询调度：每个账户轮流同步一个歌单，避免大曲库账户占满整个任务
+    queue = deque((account, account_sync_steps(account, progress)) for account in active_accounts)
+    while queue:
+        account, steps = queue.popleft()
+        try:
+            next(steps)
+        except StopIteration:
+            continue
+        except Exception as e:
+            print(f"[{account['name']}] 同步失败，跳过该账户: {str(e)}")
+            traceback.print_exc()
+            failed_accounts.append(account['name'])
+            continue
+        queue.append((account, steps))
+
+    if failed_accounts:
+        # 保留失败账户的进度，下次运行从断点继续
+        print(f"\n以下账户同步失败: {', '.join(failed_accounts)}")
+        save_progress({name: progress[name] for name in failed_accounts if name in progress})
+        # 以非零状态退出，让定时任务显示为失败（例如 cookie 过期）
+        sys.exit(1)
+
+    print("\n所有账户同步完成")
     # 同步完成后清除进度文件
     save_progress({})
 
@@ -10,6 +10,19 @@ logger = logging.getLogger(__name__)
 
 BASE_URL = "https://music.163.com/api"
 
+# 所有账户共用同一个连接池
+session = requests.Session()
+
+# 曲库可用性与账户无关，所有账户共用缓存
+availability_cache = {}
+
+def build_headers(cookie=None):
+    return {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        "Referer": "https://music.163.com/",
+        "Cookie": cookie if cookie is not None else NETEASE_COOKIE
+    }
+
 def retry_on_failure(max_retries=3, retry_delay=5):
     def decorator(func):
         @wraps(func)
@@ -27,14 +40,10 @@ def retry_on_failure(max_retries=3, retry_delay=5):
     return decorator
 
 @retry_on_failure()
-def get_playlist_info(playlist_id):
+def get_playlist_info(playlist_id, cookie=None):
     url = f"{BASE_URL}/v6/playlist/detail?id={playlist_id}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Referer": "https://music.163.com/",
-        "Cookie": NETEASE_COOKIE
-    }
-    response = requests.get(url, headers=headers)
+    headers = build_headers(cookie)
+    response = session.get(url, headers=headers)
     if response.status_code == 200:
         data = response.json()
         if 'playlist' in data:
@@ -42,19 +51,15 @@ def get_playlist_info(playlist_id):
     raise Exception(f"获取播放列表 {playlist_id} 失败。状态码: {response.status_code}")
 
 @retry_on_failure()
-def get_playlist_tracks(playlist_id):
+def get_playlist_tracks(playlist_id, cookie=None):
     all_tracks = []
     offset = 0
     limit = 1000  # 每次请求的最大数量
     
     while True:
         url = f"{BASE_URL}/v6/playlist/detail?id={playlist_id}&limit={limit}&offset={offset}&n={limit}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Referer": "https://music.163.com/",
-            "Cookie": NETEASE_COOKIE
-        }
-        response = requests.get(url, headers=headers)
+        headers = build_headers(cookie)
+        response = session.get(url, headers=headers)
         data = response.json()
         
         if data['code'] != 200:
@@ -73,50 +78,59 @@ def get_playlist_tracks(playlist_id):
     return all_tracks
 
 @retry_on_failure()
-def get_user_playlists():
+def get_user_playlists(user_id=None, cookie=None):
     """
     获取用户的所有歌单
     
+    参数:
+    user_id: 网易云用户 ID，默认为 NETEASE_USER_ID
+    cookie: 网易云 cookie，默认为 NETEASE_COOKIE
+    
     返回:
     list: 包含用户所有歌单信息的列表
     """
-    url = f"{BASE_URL}/user/playlist?uid={NETEASE_USER_ID}&limit=1000&offset=0"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Referer": "https://music.163.com/",
-        "Cookie": NETEASE_COOKIE
-    }
-    response = requests.get(url, headers=headers)
+    user_id = str(user_id or NETEASE_USER_ID)
+    url = f"{BASE_URL}/user/playlist?uid={user_id}&limit=1000&offset=0"
+    headers = build_headers(cookie)
+    response = session.get(url, headers=headers)
     if response.status_code == 200:
         data = response.json()
         if 'playlist' in data:
             # 只返回用户创建的歌单，不包括收藏的歌单
-            return [playlist for playlist in data['playlist'] if str(playlist['userId']) == NETEASE_USER_ID]
+            return [playlist for playlist in data['playlist'] if str(playlist['userId']) == user_id]
         else:
             print(f"意外的响应结构: {data}")
             raise Exception("获取用户播放列表失败。意外的响应结构。")
     raise Exception(f"获取用户播放列表失败。状态码: {response.status_code}")
 
-def get_playlist_ids():
+def get_playlist_ids(user_id=None, cookie=None):
     """
     获取用户的所有歌单ID
     
     返回:
     list: 包含用户所有歌单ID的列表
     """
-    playlists = get_user_playlists()
+    playlists = get_user_playlists(user_id, cookie)
     return [str(playlist['id']) for playlist in playlists]
 
+def check_track_availability(track_id, cookie=None):
+    track_id = str(track_id)
+    if track_id in availability_cache:
+        logger.info(f"Using cached availability for track ID: {track_id}")
+        return availability_cache[track_id]
+
+    availability = fetch_track_availability(track_id, cookie)
+    # 只缓存明确的结果，临时错误（5xx、限流等）下次重新检查
+    if availability is not None:
+        availability_cache[track_id] = availability
+    return bool(availability)
+
 @retry_on_failure()
-def check_track_availability(track_id):
+def fetch_track_availability(track_id, cookie=None):
     url = f"https://music.163.com/song?id={track_id}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Referer": "https://music.163.com/",
-        "Cookie": NETEASE_COOKIE
-    }
+    headers = build_headers(cookie)
     logger.info(f"Checking availability for track ID: {track_id}")
-    response = requests.get(url, headers=headers)
+    response = session.get(url, headers=headers)
     
     logger.info(f"Response status code: {response.status_code}")
     logger.info(f"Response content length: {len(response.text)}")
@@ -133,7 +147,7 @@ def check_track_availability(track_id):
             return True
     else:
         logger.error(f"Unexpected status code {response.status_code} for track ID {track_id}")
-        return False
+        return None
 
 # 新增函数
 def update_notion_database_structure(notion_client, database_id):
@@ -14,6 +14,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logging.basicConfig(level=logging.ERROR, format='%(message)s')
 logger = logging.getLogger(__name__)
 
+# 所有账户共用同一个 Notion 客户端（连接池）
 notion = Client(auth=NOTION_TOKEN)
 
 # 设置中国时区
@@ -35,8 +36,9 @@ def retry_on_failure(func):
     return wrapper
 
 @retry_on_failure
-def get_notion_records():
-    results = notion.databases.query(database_id=NOTION_DATABASE_ID).get('results', [])
+def get_notion_records(database_id=None):
+    database_id = database_id or NOTION_DATABASE_ID
+    results = notion.databases.query(database_id=database_id).get('results', [])
     records = {}
     for record in results:
         properties = record['properties']
@@ -48,13 +50,14 @@ def get_notion_records():
     return records
 
 @retry_on_failure
-def sync_track_to_notion(track, playlist_id, playlist_name, status, index, total, action):
-    existing_records = get_notion_records()
+def sync_track_to_notion(track, playlist_id, playlist_name, status, index, total, action, database_id=None, position=None):
+    database_id = database_id or NOTION_DATABASE_ID
+    existing_records = get_notion_records(database_id)
     track_id = str(track['id'])
     
     logger.info(f"同步歌曲 {track_id} 到 Notion。操作: {action}")
     
-    database = notion.databases.retrieve(database_id=NOTION_DATABASE_ID)
+    database = notion.databases.retrieve(database_id=database_id)
     title_property = next(prop for prop, config in database['properties'].items() if config['type'] == 'title')
     
     cover_url = track.get('al', {}).get('picUrl', '')
@@ -77,6 +80,10 @@ def sync_track_to_notion(track, playlist_id, playlist_name, status, index, total
         "歌曲ID": {"rich_text": [{"text": {"content": str(track_id)}}]},
         "状态历史": {"rich_text": []},  # 初始化为空列表
     }
+
+    # 只有顺序发生变化时才写入排序键，未移动的歌曲保留原有排序
+    if position is not None:
+        properties["排序"] = {"rich_text": [{"text": {"content": position}}]}
     
     existing_record = existing_records.get((str(track_id), str(playlist_id)))
 
@@ -101,7 +108,7 @@ def sync_track_to_notion(track, playlist_id, playlist_name, status, index, total
         logger.info(f"创建新记录，歌曲 {track_id}")
         properties["状态历史"] = {"rich_text": [{"text": {"content": new_status_entry}}]}
         notion.pages.create(
-            parent={"database_id": NOTION_DATABASE_ID},
+            parent={"database_id": database_id},
             properties=properties
         )
 
@@ -118,8 +125,9 @@ def get_status_color(status):
     return status_colors.get(status, 'gray')
 
 @retry_on_failure
-def mark_track_as_removed(track_id, playlist_id, playlist_name):
-    existing_records = get_notion_records()
+def mark_track_as_removed(track_id, playlist_id, playlist_name, database_id=None):
+    database_id = database_id or NOTION_DATABASE_ID
+    existing_records = get_notion_records(database_id)
     if track_id in existing_records:
         record = existing_records[track_id]
         if record['properties']['歌单']['rich_text'][0]['text']['content'] == playlist_name:
@@ -138,8 +146,9 @@ def mark_track_as_removed(track_id, playlist_id, playlist_name):
         return f"无法找到要标记为已下架的歌曲: ID {track_id}"
 
 @retry_on_failure
-def mark_track_as_removed_from_playlist(track_id, playlist_id, playlist_name):
-    existing_records = get_notion_records()
+def mark_track_as_removed_from_playlist(track_id, playlist_id, playlist_name, database_id=None):
+    database_id = database_id or NOTION_DATABASE_ID
+    existing_records = get_notion_records(database_id)
     key = (str(track_id), str(playlist_id))
     if key in existing_records:
         record = existing_records[key]
@@ -156,8 +165,9 @@ def mark_track_as_removed_from_playlist(track_id, playlist_id, playlist_name):
         return f"无法找到要处理的歌曲: ID {track_id}"
 
 @retry_on_failure
-def mark_track_as_unavailable(track_id, playlist_id):
-    existing_records = get_notion_records()
+def mark_track_as_unavailable(track_id, playlist_id, database_id=None):
+    database_id = database_id or NOTION_DATABASE_ID
+    existing_records = get_notion_records(database_id)
     key = (str(track_id), str(playlist_id))
     if key in existing_records:
         record = existing_records[key]
@@ -174,11 +184,23 @@ def mark_track_as_unavailable(track_id, playlist_id):
         return f"无法找到要标记为已下架的歌曲: ID {track_id}"
 
 @retry_on_failure
-def verify_notion_database_structure():
+def update_track_position(page_id, track_id, position):
+    # 页面 ID 由 get_notion_tracks 提供，无需再查询整个数据库
+    notion.pages.update(
+        page_id=page_id,
+        properties={
+            "排序": {"rich_text": [{"text": {"content": position}}]},
+        }
+    )
+    return f"更新歌曲排序: ID {track_id}, 排序: {position}"
+
+@retry_on_failure
+def verify_notion_database_structure(database_id=None):
+    database_id = database_id or NOTION_DATABASE_ID
     try:
         logging.info("开始验证 Notion 数据库结构...")
-        database = notion.databases.retrieve(database_id=NOTION_DATABASE_ID)
-        logging.info(f"成功检索到数据库。数据库 ID: {NOTION_DATABASE_ID}")
+        database = notion.databases.retrieve(database_id=database_id)
+        logging.info(f"成功检索到数据库。数据库 ID: {database_id}")
         existing_properties = database['properties']
         
         # 检查是否已存在 title 属性
@@ -212,6 +234,7 @@ def verify_notion_database_structure():
             '歌单ID': {'rich_text': {}},
             '歌曲ID': {'rich_text': {}},
             '状态历史': {'rich_text': {}},  # 添加这一行
+            '排序': {'rich_text': {}},
         }
 
         properties_to_update = {}
@@ -226,7 +249,7 @@ def verify_notion_database_structure():
         if properties_to_update:
             logging.info("正在更新数据库属性...")
             notion.databases.update(
-                database_id=NOTION_DATABASE_ID,
+                database_id=database_id,
                 properties=properties_to_update
             )
             logging.info("数据库属性更新成功。")
@@ -240,12 +263,13 @@ def verify_notion_database_structure():
         return False
 
 @retry_on_failure
-def get_notion_tracks():
-    results = notion.databases.query(database_id=NOTION_DATABASE_ID).get('results', [])
+def get_notion_tracks(database_id=None):
+    database_id = database_id or NOTION_DATABASE_ID
+    results = notion.databases.query(database_id=database_id).get('results', [])
     tracks = []
     
     # 获取数据库结构，找到标题属性
-    database = notion.databases.retrieve(database_id=NOTION_DATABASE_ID)
+    database = notion.databases.retrieve(database_id=database_id)
     title_property = next((prop for prop, config in database['properties'].items() if config['type'] == 'title'), None)
     
     if not title_property:
@@ -260,6 +284,7 @@ def get_notion_tracks():
                 continue
 
             track = {
+                '页面ID': record['id'],
                 '歌手': properties.get(title_property, {}).get('title', [{}])[0].get('text', {}).get('content', '未知歌手'),
                 '歌名': properties.get('歌名', {}).get('rich_text', [{}])[0].get('text', {}).get('content', '未知歌曲'),
                 '专辑': properties.get('专辑', {}).get('rich_text', [{}])[0].get('text', {}).get('content', '未知专辑'),
@@ -268,7 +293,9 @@ def get_notion_tracks():
                 '最后同步日期': properties.get('最后同步日期', {}).get('date', {}).get('start', ''),
                 '歌单': properties.get('歌单', {}).get('rich_text', [{}])[0].get('text', {}).get('content', ''),
                 '歌单ID': properties.get('歌单ID', {}).get('rich_text', [{}])[0].get('text', {}).get('content', ''),
-                '歌曲ID': properties.get('歌曲ID', {}).get('rich_text', [{}])[0].get('text', {}).get('content', '')
+                '歌曲ID': properties.get('歌曲ID', {}).get('rich_text', [{}])[0].get('text', {}).get('content', ''),
+                # 旧记录可能没有排序键，rich_text 为空列表
+                '排序': (properties.get('排序', {}).get('rich_text') or [{}])[0].get('text', {}).get('content', '')
             }
             tracks.append(track)
         except Exception as e:
@@ -278,7 +305,8 @@ def get_notion_tracks():
     return tracks
 
 @retry_on_failure
-def create_notion_playlist(playlist_info):
+def create_notion_playlist(playlist_info, database_id=None):
+    database_id = database_id or NOTION_DATABASE_ID
     properties = {
         "名称": {"title": [{"text": {"content": playlist_info['name']}}]},
         "歌单ID": {"rich_text": [{"text": {"content": str(playlist_info['id'])}}]},
@@ -288,7 +316,7 @@ def create_notion_playlist(playlist_info):
     }
     
     notion.pages.create(
-        parent={"database_id": NOTION_DATABASE_ID},
+        parent={"database_id": database_id},
         properties=properties
     )
     logger.info(f"在 Notion 中创建了新歌单: {playlist_info['name']}")
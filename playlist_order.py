@@ -0,0 +1,239 @@
+from bisect import bisect_left
+
+# 排序键使用的字符集，按 ASCII 顺序排列，保证字符串比较与数值顺序一致
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# 排序键 = 整数部分 + 小数部分
+# 整数部分首字符表示长度：'i'..'z' 为正数（'i' 后跟 1 位，'z' 后跟 18 位），
+# 'h'..'0' 为负数（'h' 后跟 1 位，'0' 后跟 18 位），位数越多的负数越小。
+# 在首尾插入时只需递增或递减整数部分，键长按对数增长。
+POSITIVE_HEAD = 'i'
+NEGATIVE_HEAD = 'h'
+INTEGER_ZERO = POSITIVE_HEAD + DIGITS[0]
+SMALLEST_INTEGER = DIGITS[0] + DIGITS[0] * 18
+
+# 反复在同一间隙插入时小数部分会持续变长，超过该长度时整个歌单重新生成排序键，
+# 远低于 Notion rich_text 的 2000 字符上限
+MAX_KEY_LENGTH = 100
+
+def get_integer_length(head):
+    if head >= POSITIVE_HEAD:
+        return DIGITS.index(head) - DIGITS.index(POSITIVE_HEAD) + 2
+    return DIGITS.index(NEGATIVE_HEAD) - DIGITS.index(head) + 2
+
+def split_key(key):
+    integer_length = get_integer_length(key[0])
+    return key[:integer_length], key[integer_length:]
+
+def is_valid_key(key):
+    """
+    检查排序键是否合法
+
+    "排序" 列可以在 Notion 中手动编辑，不合法的值视为未排序
+    """
+    if not key or any(char not in DIGITS for char in key):
+        return False
+    integer_length = get_integer_length(key[0])
+    if len(key) < integer_length:
+        return False
+    if key[:integer_length] == SMALLEST_INTEGER:
+        return False
+    return not key.endswith(DIGITS[0]) or len(key) == integer_length
+
+def increment_integer(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        digit = DIGITS.index(digits[i]) + 1
+        if digit < len(DIGITS):
+            digits[i] = DIGITS[digit]
+            return head + ''.join(digits)
+        digits[i] = DIGITS[0]
+
+    # 当前长度已用尽，换到下一个首字符
+    if head == DIGITS[-1]:
+        return None
+    if head == NEGATIVE_HEAD:
+        return INTEGER_ZERO
+    next_head = DIGITS[DIGITS.index(head) + 1]
+    if next_head > POSITIVE_HEAD:
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return next_head + ''.join(digits)
+
+def decrement_integer(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        digit = DIGITS.index(digits[i]) - 1
+        if digit >= 0:
+            digits[i] = DIGITS[digit]
+            return head + ''.join(digits)
+        digits[i] = DIGITS[-1]
+
+    if head == DIGITS[0]:
+        return None
+    if head == POSITIVE_HEAD:
+        return NEGATIVE_HEAD + DIGITS[-1]
+    previous_head = DIGITS[DIGITS.index(head) - 1]
+    if previous_head < NEGATIVE_HEAD:
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return previous_head + ''.join(digits)
+
+def midpoint(a, b):
+    """
+    生成严格位于小数部分 a 与 b 之间的小数部分
+
+    参数:
+    a: 下界，'' 表示 0
+    b: 上界，None 表示 1
+
+    结果不会以 '0' 结尾，因此任意两个键之间总能再插入新的键
+    """
+    if b is not None:
+        # 跳过公共前缀
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b) // 2]
+
+    # 首位相邻时，在更长的位数上继续取中点
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + midpoint(a[1:], None)
+
+def key_between(a, b):
+    """
+    生成一个严格位于 a 与 b 之间的排序键
+
+    参数:
+    a: 下界，None 表示没有下界
+    b: 上界，None 表示没有上界
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"排序键下界必须小于上界: {a!r} >= {b!r}")
+
+    if a is None and b is None:
+        return INTEGER_ZERO
+
+    if a is None:
+        integer_b, fraction_b = split_key(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + midpoint('', fraction_b)
+        if fraction_b:
+            return integer_b
+        return decrement_integer(integer_b)
+
+    integer_a, fraction_a = split_key(a)
+    if b is None:
+        next_integer = increment_integer(integer_a)
+        return next_integer if next_integer is not None else integer_a + midpoint(fraction_a, None)
+
+    integer_b, fraction_b = split_key(b)
+    if integer_a == integer_b:
+        return integer_a + midpoint(fraction_a, fraction_b)
+    next_integer = increment_integer(integer_a)
+    if next_integer is not None and next_integer < b:
+        return next_integer
+    return integer_a + midpoint(fraction_a, None)
+
+def keys_between(a, b, count):
+    """
+    生成 count 个递增的排序键，全部位于 a 与 b 之间
+
+    追加到首尾时逐个递增或递减整数部分，夹在两个键之间时二分生成，
+    使批量插入时各个键的长度尽量均衡
+    """
+    if count <= 0:
+        return []
+    if b is None:
+        keys = []
+        for _ in range(count):
+            a = key_between(a, None)
+            keys.append(a)
+        return keys
+    if a is None:
+        keys = []
+        for _ in range(count):
+            b = key_between(None, b)
+            keys.append(b)
+        return keys[::-1]
+    mid = key_between(a, b)
+    left = keys_between(a, mid, count // 2)
+    right = keys_between(mid, b, count - count // 2 - 1)
+    return left + [mid] + right
+
+def longest_increasing_keys(track_ids, positions):
+    """
+    找出按当前顺序排序键严格递增的最长子序列
+
+    两个顺序互为排列，因此其 LCS 等价于此处的 LIS，复杂度 O(n log n)
+
+    返回:
+    set: 保持原排序键不变的歌曲 ID
+    """
+    tail_keys = []
+    tail_indexes = []
+    previous = [None] * len(track_ids)
+
+    for index, track_id in enumerate(track_ids):
+        key = positions[track_id]
+        slot = bisect_left(tail_keys, key)
+        previous[index] = tail_indexes[slot - 1] if slot > 0 else None
+        if slot == len(tail_keys):
+            tail_keys.append(key)
+            tail_indexes.append(index)
+        else:
+            tail_keys[slot] = key
+            tail_indexes[slot] = index
+
+    kept = set()
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        kept.add(track_ids[index])
+        index = previous[index]
+    return kept
+
+def compute_position_updates(track_ids, stored_positions):
+    """
+    计算把 Notion 中的顺序调整为网易云顺序所需的最少排序键修改
+
+    参数:
+    track_ids: 网易云歌单中的歌曲 ID 列表（按歌单顺序）
+    stored_positions: Notion 中已保存的 {歌曲ID: 排序键}，空字符串或不合法的值表示尚未排序
+
+    返回:
+    dict: 需要写入的 {歌曲ID: 新排序键}，未移动的歌曲不会出现在结果中；
+    新键过长时返回整个歌单的新排序键
+    """
+    track_ids = list(dict.fromkeys(str(track_id) for track_id in track_ids))
+    positioned = {
+        track_id: stored_positions[track_id]
+        for track_id in track_ids
+        if is_valid_key(stored_positions.get(track_id))
+    }
+    kept = longest_increasing_keys([t for t in track_ids if t in positioned], positioned)
+
+    updates = {}
+    pending = []
+    lower = None
+    for track_id in track_ids + [None]:
+        if track_id is not None and track_id not in kept:
+            pending.append(track_id)
+            continue
+        upper = positioned[track_id] if track_id is not None else None
+        for pending_id, key in zip(pending, keys_between(lower, upper, len(pending))):
+            updates[pending_id] = key
+        pending = []
+        lower = upper
+
+    if any(len(key) > MAX_KEY_LENGTH for key in updates.values()):
+        return dict(zip(track_ids, keys_between(None, None, len(track_ids))))
+    return updates